@@ -3,8 +3,12 @@ from groq import Groq
 import datetime
 import pandas as pd
 import os
-import requests
 from textblob import TextBlob # Import TextBlob
+from journal import CompactJournal
+from comfort import (
+    DEFAULT_AI_MODEL, search_dish_image, get_dish_name, parse_ai_response,
+    get_sentiment_label, build_human_friend_response, build_comfort_prompt
+)
 
 # --- API Key Handling ---
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -20,55 +24,16 @@ if not UNSPLASH_ACCESS_KEY:
     print("Unsplash API key not found. Image fetching will be skipped.")
 # --- End API Key Handling ---
 
-# --- Define a default AI model ---
-DEFAULT_AI_MODEL = "llama3-8b-8192"
-# --- End Default AI Model ---
-
 # Helper to fetch dish image from Unsplash
 def get_dish_image(query):
     if not UNSPLASH_ACCESS_KEY:
         return None
-    url = "https://api.unsplash.com/search/photos"
-    params = {
-        "query": query,
-        "per_page": 1,
-        "client_id": UNSPLASH_ACCESS_KEY
-    }
     try:
-        res = requests.get(url, params=params, timeout=10)
-        res.raise_for_status()
-        data = res.json()
-        if data["results"]:
-            return data["results"][0]["urls"]["regular"]
+        return search_dish_image(query, UNSPLASH_ACCESS_KEY)
     except Exception as e:
         st.error(f"Error fetching image: {e}")
         return None
 
-# --- Robust AI Response Parsing Function ---
-def parse_ai_response(text):
-    data = {}
-    keys_order = ["Comfort", "Recipe", "Vibe", "Song", "Anti-Stress Activity"]
-    current_key = None
-    current_value_lines = []
-    lines = text.strip().split('\n')
-    for line in lines:
-        line = line.strip()
-        found_key = False
-        for key in keys_order:
-            if line.startswith(f"**{key}:**"):
-                if current_key:
-                    data[current_key] = "\n".join(current_value_lines).strip()
-                current_key = key
-                current_value_lines = [line[len(f"**{key}:**"):].strip()]
-                found_key = True
-                break
-        if not found_key and current_key:
-            current_value_lines.append(line)
-    if current_key:
-        data[current_key] = "\n".join(current_value_lines).strip()
-    return data
-# --- End Robust AI Response Parsing Function ---
-
 # Helper to convert color names to approximate hex codes for display
 COLOR_MAP = {
     "red": "#FF0000", "blue": "#0000FF", "green": "#008000", "yellow": "#FFFF00",
@@ -90,49 +55,9 @@ def display_color_palette(vibe_text):
         html_colors += f'<div style="width: 30px; height: 30px; background-color: {hex_code}; border-radius: 50%; display: inline-block; margin: 0 5px; border: 1px solid rgba(255,255,255,0.5);" title="{name.capitalize()}"></div>'
     return html_colors
 
-# Function to get sentiment label - IMPROVED with more keywords
-def get_sentiment_label(polarity, mood_text):
-    mood_text_lower = mood_text.lower()
-        # Expanded lists for strong keywords
-    strong_negative_keywords = [
-        "depressed", "suicidal", "hopeless", "devastated", "miserable", "despair", "broken",
-        "crushed", "grief", "sorrow", "anguish", "dread", "heartbroken", "downhearted",
-        "distraught", "agonizing", "shattered", "desperate", "overwhelmed", "anxious",
-        "stressed", "terrible", "awful", "horrible", "sad", "unhappy", "lonely", "exhausted",
-        "tired", "worn out", "burnt out", "frustrated", "angry", "furious", "irritated",
-        "annoyed", "bitter", "resentful", "lost", "confused", "empty", "worthless",
-        "guilty", "ashamed", "scared", "fearful", "terrified", "panicked", "nervous"
-    ]
-    strong_positive_keywords = [
-        "ecstatic", "euphoric", "elated", "overjoyed", "thrilled", "jubilant", "blissful",
-        "fantastic", "amazing", "wonderful", "great", "excellent", "superb", "brilliant",
-        "happy", "joyful", "excited", "optimistic", "hopeful", "grateful", "blessed",
-        "proud", "confident", "energetic", "refreshed", "peaceful", "calm", "serene",
-        "loved", "appreciated", "inspired", "motivated", "content", "satisfied"
-    ]
-    # Check for strong negative keywords first
-    for keyword in strong_negative_keywords:
-        if keyword in mood_text_lower:
-            return "Very Negative 😥" # Override to very negative if such words are present
-    # Check for strong positive keywords
-    for keyword in strong_positive_keywords:
-        if keyword in mood_text_lower:
-            return "Very Positive 😄" # Override to very positive if such words are present
-    # Fallback to polarity score if no strong keywords are found
-    if polarity <= -0.5:
-        return "Very Negative 😔"
-    elif polarity <= -0.1:
-        return "Negative 😞"
-    elif polarity >= 0.5:
-        return "Very Positive 😄"
-    elif polarity >= 0.1:
-        return "Positive 🙂"
-    else:
-        return "Neutral 😐"
-
 # --- Session State Initialization ---
 if "journal" not in st.session_state:
-    st.session_state.journal = []
+    st.session_state.journal = CompactJournal() # Columnar store, far smaller than a list of dicts
 if "mood" not in st.session_state:
     st.session_state.mood = ""
 if "last_response_data" not in st.session_state:
@@ -447,61 +372,10 @@ if st.button("🌟 Get Comfort & Recipe", key="get_comfort_button"):
             response_text = ""
             if who == "🧑 Human Friend":
                 # For human friend, keep it simple and universally comforting
-                comfort = "I’m here for you. It sounds like you're going through a lot. Let’s talk, cry, laugh — whatever you need, I’m with you. ❤️"
-                recipe = "Warm, homemade Chicken Noodle Soup — perfect for when you need a gentle hug in a bowl."
-                vibe = "☔️🌧️✨ — Blue, Grey, Warm Yellow" # Updated vibe for depressive mood
-                song = "'Fix You' — Coldplay" # More comforting song
-                anti_stress_activity = ""
-                response_text = f"""
-                **Comfort:** {comfort}
-                **Recipe:** {recipe}
-                **Vibe:** {vibe}
-                **Song:** {song}
-                """
-                if anti_stress_activity:
-                    response_text += f"\n**Anti-Stress Activity:** {anti_stress_activity}"
+                response_text = build_human_friend_response()
             else: # User selected "🤖 AI"
                 selected_model = DEFAULT_AI_MODEL
-                                
-                # --- Refined Sentiment Adjective for AI Prompt ---
-                sentiment_adjective = ""
-                if "very negative" in sentiment_label.lower():
-                    sentiment_adjective = "feeling very low and needs extremely gentle, empathetic, and uplifting support"
-                elif "negative" in sentiment_label.lower():
-                    sentiment_adjective = "feeling negative and needs understanding and uplifting support"
-                elif "very positive" in sentiment_label.lower():
-                    sentiment_adjective = "feeling very positive and wants enthusiastic, joyful suggestions"
-                elif "positive" in sentiment_label.lower():
-                    sentiment_adjective = "feeling positive and needs supportive, encouraging messages"
-                else:
-                    sentiment_adjective = "feeling neutral and needs a general supportive and positive message"
-
-                # Check for stress keywords
-                is_stressed = any(keyword in mood.lower() for keyword in ["stressed", "anxious", "overwhelmed", "tense", "nervous"])
-                
-                prompt = f"""
-                I am an emotionally intelligent assistant. A person just said: '{mood}'.
-                Based on my analysis, their mood suggests they are {sentiment_adjective}.
-                Please respond with the following in a friendly, soulful tone, specifically tailored to provide comfort and upliftment for their current emotional state:
-                1. Comfort: A short, kind, comforting message, explicitly acknowledging the depth of their feelings if negative.
-                2. Recipe: A recipe suggestion that gently matches their mood, focusing on comfort food if negative, or celebratory food if positive. Include dish name + short description.
-                3. Vibe: A string of 3–5 relevant emojis and a color palette (3 colors, names not codes) that genuinely reflects a pathway to positive emotion or acknowledges the current state with hope.
-                4. Song: A song title + artist that is genuinely soothing and uplifting for their specific mood.
-                """
-                if is_stressed:
-                    prompt += """
-                    5. Anti-Stress Activity: A short, interactive prompt or simple activity to help alleviate stress (e.g., a 2-minute mindful breathing guide, or "Describe your ideal calm place in three words.").
-                    """
-                                
-                prompt += """
-                Format:
-                **Comfort:** ...
-                **Recipe:** ...
-                **Vibe:** ...
-                **Song:** ...
-                """
-                if is_stressed:
-                    prompt += "**Anti-Stress Activity:** ..."
+                prompt = build_comfort_prompt(mood, sentiment_label)
 
                 response = client.chat.completions.create(
                     model=selected_model,
@@ -559,7 +433,7 @@ if st.session_state.last_response_data:
         """, unsafe_allow_html=True)
             
     # Extract dish name & fetch image
-    dish_name = recipe_part.split("—")[0].strip() if "—" in recipe_part else recipe_part
+    dish_name = get_dish_name(recipe_part)
     image_url = get_dish_image(dish_name)
         
     # Display image in a full-width section below the two columns
@@ -638,9 +512,8 @@ if st.session_state.last_response_data:
     # --- End Feeling Better Section ---
 
     # Save to journal after successful display
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
     st.session_state.journal.append({
-        "time": now,
+        "timestamp": datetime.datetime.now().timestamp(),
         "mood": st.session_state.mood,
         "who": st.session_state.last_who_selected,
         "sentiment_polarity": st.session_state.last_sentiment_polarity, # Save sentiment
@@ -664,7 +537,7 @@ if st.session_state.journal:
         </div>
         """, unsafe_allow_html=True)
     if st.button("📥 Download Mood Journal", key="download_journal_button"):
-        df = pd.DataFrame(st.session_state.journal)
+        df = pd.DataFrame(st.session_state.journal.to_records())
         st.download_button("Download as CSV", df.to_csv(index=False), file_name="mood_journal.csv")
 
 # --- About / Footer Section ---
@@ -0,0 +1,452 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from groq import APIConnectionError, AsyncGroq, InternalServerError, RateLimitError
+from textblob import TextBlob
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Only needed for Parquet output
+    pa = pq = None
+
+from comfort import (
+    DEFAULT_AI_MODEL, UNSPLASH_SEARCH_URL, search_dish_image, get_dish_name,
+    parse_ai_response, get_sentiment_label, build_human_friend_response, build_comfort_prompt
+)
+
+# --- Bulk Offline Processing ---
+# Runs mood texts from a CSV/JSONL file through the same pipeline as the
+# "Get Comfort & Recipe" button and writes one result record per mood:
+#
+#   python bulk.py moods.csv results.jsonl --text-column mood --id-column id
+#
+# Moods are streamed in batches: each batch is sentiment-scored, its LLM
+# completions run concurrently (bounded by --concurrency and paced by
+# --requests-per-minute, retries included), dish images are resolved through a cache, and the
+# finished batch is appended to the output. The output doubles as the
+# checkpoint: re-running the same command skips ids that are already written,
+# so an interrupted run picks up where it left off. Failed moods are reported
+# on stderr and left out, so a re-run retries them.
+#
+# --groq-base-url and --unsplash-url point the run at other servers, e.g. local
+# stubs for end-to-end testing.
+
+WHO_CHOICES = {"ai": "🤖 AI", "human": "🧑 Human Friend"}
+OUTPUT_FIELDS = [
+    "id", "mood", "who", "sentiment_polarity", "sentiment_label", "response",
+    "comfort", "recipe", "vibe", "song", "anti_stress_activity", "dish_name", "image_url",
+]
+
+
+def _is_jsonl(path):
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+
+# (row number, parsed object) for each non-blank JSONL line; bad lines are
+# reported and skipped rather than ending the run
+def _jsonl_rows(f, warn=True):
+    row_number = 0
+    for line in f:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except ValueError:
+            if warn:
+                print(f"Skipping row {row_number}: invalid JSON", file=sys.stderr)
+
+
+# Column names in the CSV header, or keys of the first valid JSONL object
+def read_columns(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if not _is_jsonl(path):
+            return csv.DictReader(f).fieldnames or []
+        for _, row in _jsonl_rows(f, warn=False):
+            return list(row) if isinstance(row, dict) else []
+    return []
+
+
+# Stream (id, mood) pairs from a CSV or JSONL file; ids default to the 1-based row number
+def read_moods(path, text_column, id_column=None):
+    with open(path, newline="", encoding="utf-8") as f:
+        if _is_jsonl(path):
+            rows = _jsonl_rows(f)
+        else:
+            rows = enumerate(csv.DictReader(f), start=1)
+        for row_number, row in rows:
+            if not isinstance(row, dict):
+                print(f"Skipping row {row_number}: not a JSON object", file=sys.stderr)
+                continue
+            mood = row.get(text_column)
+            mood = "" if mood is None else str(mood).strip()
+            if not mood:
+                continue
+            if not id_column:
+                yield str(row_number), mood
+                continue
+            # No row-number fallback here: it could collide with a real id
+            row_id = row.get(id_column)
+            row_id = "" if row_id is None else str(row_id).strip()
+            if not row_id:
+                print(f"Skipping row {row_number}: no {id_column!r} value", file=sys.stderr)
+                continue
+            yield row_id, mood
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Sentiment scoring, same as the app: TextBlob polarity + keyword-aware label
+def score_sentiment(moods):
+    scores = []
+    for mood in moods:
+        polarity = TextBlob(mood).sentiment.polarity
+        scores.append((polarity, get_sentiment_label(polarity, mood)))
+    return scores
+
+
+class RateLimiter:
+    """Spaces out request starts so at most `per_minute` begin in any minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def retry_delay(error, attempt):
+        # Honour the server's Retry-After, else back off exponentially
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            if "retry-after-ms" in headers:
+                return min(float(headers["retry-after-ms"]) / 1000, 60.0)
+            if "retry-after" in headers:
+                return min(float(headers["retry-after"]), 60.0)
+        except ValueError:
+            pass
+        return min(0.5 * 2 ** attempt, 8.0)
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ImageCache:
+    """Dish name -> Unsplash image URL, shared across the run and optionally saved to JSON."""
+
+    def __init__(self, access_key, url=UNSPLASH_SEARCH_URL, path=None, concurrency=4):
+        self.access_key = access_key
+        self.url = url
+        self.path = path
+        self.urls = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.urls = json.load(f)
+        self._pending = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def get(self, dish_name):
+        if not self.access_key or not dish_name:
+            return None
+        key = dish_name.strip().lower()
+        if key in self.urls:
+            return self.urls[key]
+        # Moods in the same batch often share a dish; only look each one up once
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(dish_name))
+            self._pending[key] = task
+        try:
+            image_url = await task
+        except Exception as e:
+            print(f"Error fetching image for {dish_name!r}: {e}", file=sys.stderr)
+            return None
+        finally:
+            self._pending.pop(key, None)
+        self.urls[key] = image_url
+        return image_url
+
+    async def _fetch(self, dish_name):
+        async with self._semaphore:
+            return await asyncio.to_thread(search_dish_image, dish_name, self.access_key, self.url)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.urls, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class JsonlWriter:
+    """Appends result records to a JSONL file, flushed to disk after every batch."""
+
+    def __init__(self, path):
+        if os.path.exists(path):
+            _drop_partial_last_line(path)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def done_ids(path):
+        if not os.path.exists(path):
+            return set()
+        ids = set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ids.add(str(json.loads(line)["id"]))
+                except (ValueError, KeyError, TypeError):
+                    continue # Partial line from an interrupted run
+        return ids
+
+    def write(self, records):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes each batch as its own part file inside the output directory."""
+
+    # Fixed so every part file shares one schema; a batch whose image lookups all
+    # failed would otherwise get a null-typed image_url column
+    SCHEMA = pa.schema([
+        (name, pa.float64() if name == "sentiment_polarity" else pa.string())
+        for name in OUTPUT_FIELDS
+    ]) if pa else None
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        # Temp files start with "." so dataset reads skip them; drop any left by a killed run
+        for name in os.listdir(path):
+            if name.startswith(".") and name.endswith(".tmp"):
+                os.remove(os.path.join(path, name))
+        self.path = path
+        self._part = len(self._part_files(path))
+
+    @staticmethod
+    def _part_files(path):
+        return sorted(
+            name for name in os.listdir(path)
+            if name.endswith(".parquet") and not name.startswith((".", "_"))
+        )
+
+    @staticmethod
+    def done_ids(path):
+        if not os.path.isdir(path) or not ParquetWriter._part_files(path):
+            return set()
+        return set(pq.read_table(path, columns=["id"]).column("id").to_pylist())
+
+    def write(self, records):
+        name = f"part-{self._part:05d}.parquet"
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        pq.write_table(pa.Table.from_pylist(records, schema=self.SCHEMA), tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, name)) # A part file is either complete or absent
+        self._part += 1
+
+    def close(self):
+        pass
+
+
+def _drop_partial_last_line(path):
+    # Truncate anything after the last newline so appends start on a fresh line
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - 65536)
+            f.seek(chunk_start)
+            chunk = f.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = chunk_start + newline + 1
+                break
+            position = chunk_start
+        if position != end:
+            f.truncate(position)
+
+
+async def process_mood(row_id, mood, polarity, label, args, client, limiter, semaphore, images):
+    if args.who == "human":
+        response_text = build_human_friend_response()
+    else:
+        prompt = build_comfort_prompt(mood, label)
+        # Retries are done here rather than in the SDK so every attempt goes through the limiter
+        for attempt in range(args.max_retries + 1):
+            async with semaphore:
+                await limiter.wait()
+                try:
+                    response = await client.chat.completions.create(
+                        model=args.model,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    break
+                except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                    if attempt == args.max_retries:
+                        raise
+                    delay = RateLimiter.retry_delay(e, attempt)
+            await asyncio.sleep(delay)
+        response_text = response.choices[0].message.content
+
+    parsed = parse_ai_response(response_text)
+    recipe_part = parsed.get("Recipe", "")
+    dish_name = get_dish_name(recipe_part) if recipe_part else ""
+    image_url = await images.get(dish_name) if images else None
+    return {
+        "id": row_id,
+        "mood": mood,
+        "who": WHO_CHOICES[args.who],
+        "sentiment_polarity": polarity,
+        "sentiment_label": label,
+        "response": response_text,
+        "comfort": parsed.get("Comfort", ""),
+        "recipe": recipe_part,
+        "vibe": parsed.get("Vibe", ""),
+        "song": parsed.get("Song", ""),
+        "anti_stress_activity": parsed.get("Anti-Stress Activity", ""),
+        "dish_name": dish_name,
+        "image_url": image_url,
+    }
+
+
+# Drop moods already in the output, and any later repeat of an id in the input
+def _skip_done(moods, done):
+    seen = set()
+    for row_id, mood in moods:
+        if row_id in seen:
+            print(f"Skipping mood {row_id}: duplicate id in input", file=sys.stderr)
+            continue
+        seen.add(row_id)
+        if row_id not in done:
+            yield row_id, mood
+
+
+async def run(args):
+    writer_class = ParquetWriter if args.format == "parquet" else JsonlWriter
+    done = writer_class.done_ids(args.output)
+    if done:
+        print(f"Resuming: {len(done)} moods already in {args.output}", file=sys.stderr)
+
+    client = None
+    if args.who == "ai":
+        client = AsyncGroq(
+            api_key=os.getenv("GROQ_API_KEY"),
+            base_url=args.groq_base_url,
+            max_retries=0, # process_mood retries, so attempts are rate limited
+        )
+    limiter = RateLimiter(args.requests_per_minute)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    images = None
+    if not args.no_images:
+        access_key = os.getenv("UNSPLASH_ACCESS_KEY")
+        if not access_key:
+            print("Unsplash API key not found. Image fetching will be skipped.", file=sys.stderr)
+        images = ImageCache(access_key, args.unsplash_url, args.image_cache, args.image_concurrency)
+
+    written = failed = 0
+    writer = writer_class(args.output)
+    try:
+        pending = _skip_done(read_moods(args.input, args.text_column, args.id_column), done)
+        for batch in batched(pending, args.batch_size):
+            scores = score_sentiment([mood for _, mood in batch])
+            results = await asyncio.gather(
+                *(
+                    process_mood(row_id, mood, polarity, label, args, client, limiter, semaphore, images)
+                    for (row_id, mood), (polarity, label) in zip(batch, scores)
+                ),
+                return_exceptions=True,
+            )
+            records = []
+            for (row_id, _), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    print(f"Error processing mood {row_id}: {result}", file=sys.stderr)
+                    failed += 1
+                else:
+                    records.append(result)
+            if records:
+                writer.write(records)
+                written += len(records)
+            if images:
+                images.save()
+            print(f"Processed {written} moods ({failed} failed)", file=sys.stderr)
+    finally:
+        writer.close()
+        if client:
+            await client.close()
+    return written, failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run mood texts through the Comfort-Buddy pipeline in bulk.")
+    parser.add_argument("input", help="CSV or JSONL (.jsonl/.ndjson) file of mood texts")
+    parser.add_argument("output", help="JSONL file, or directory of Parquet part files")
+    parser.add_argument("--format", choices=["jsonl", "parquet"],
+                        help="Output format (default: parquet if output ends in .parquet, else jsonl)")
+    parser.add_argument("--text-column", default="mood", help="Column/key holding the mood text (default: mood)")
+    parser.add_argument("--id-column", help="Column/key holding a unique id (default: row number)")
+    parser.add_argument("--who", choices=list(WHO_CHOICES), default="ai", help="Who should comfort (default: ai)")
+    parser.add_argument("--model", default=DEFAULT_AI_MODEL, help=f"Groq model (default: {DEFAULT_AI_MODEL})")
+    parser.add_argument("--batch-size", type=int, default=50, help="Moods per batch and checkpoint (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max in-flight LLM requests (default: 8)")
+    parser.add_argument("--requests-per-minute", type=float, default=30,
+                        help="LLM request rate limit, retries included; 0 to disable (default: 30)")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="Retries per LLM request on rate limit, server or connection errors (default: 5)")
+    parser.add_argument("--no-images", action="store_true", help="Skip dish image lookups")
+    parser.add_argument("--image-cache", help="JSON file to persist dish image URLs across runs")
+    parser.add_argument("--image-concurrency", type=int, default=4, help="Max in-flight image lookups (default: 4)")
+    parser.add_argument("--groq-base-url", help="Override the Groq API base URL")
+    parser.add_argument("--unsplash-url", default=UNSPLASH_SEARCH_URL, help="Override the Unsplash search URL")
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = "parquet" if args.output.rstrip("/").endswith(".parquet") else "jsonl"
+    if args.format == "parquet" and pa is None:
+        parser.error("Parquet output needs pyarrow: pip install pyarrow")
+    if not os.path.exists(args.input):
+        parser.error(f"input file not found: {args.input}")
+    columns = read_columns(args.input)
+    for option, column in (("--text-column", args.text_column), ("--id-column", args.id_column)):
+        if column is not None and column not in columns:
+            parser.error(f"{option} {column!r} not found in {args.input} (columns: {', '.join(map(str, columns))})")
+    if args.batch_size < 1 or args.concurrency < 1 or args.image_concurrency < 1:
+        parser.error("--batch-size, --concurrency and --image-concurrency must be at least 1")
+    if args.requests_per_minute < 0 or args.max_retries < 0:
+        parser.error("--requests-per-minute and --max-retries must not be negative")
+    if args.who == "ai" and not os.getenv("GROQ_API_KEY"):
+        parser.error("GROQ_API_KEY not found. Please set it as an environment variable.")
+    return args
+# --- End Bulk Offline Processing ---
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    written, failed = asyncio.run(run(args))
+    print(f"Done: {written} moods written to {args.output}, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
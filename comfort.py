@@ -0,0 +1,156 @@
+import requests
+
+# Shared comfort pipeline: sentiment scoring, prompt building, response parsing
+# and image lookup. Used by both the Streamlit app (app.py) and the bulk CLI
+# (bulk.py), so it must not import streamlit.
+
+# --- Define a default AI model ---
+DEFAULT_AI_MODEL = "llama3-8b-8192"
+# --- End Default AI Model ---
+
+UNSPLASH_SEARCH_URL = "https://api.unsplash.com/search/photos"
+
+# Search Unsplash for a dish photo; returns the image URL or None, raises on HTTP errors
+def search_dish_image(query, access_key, url=UNSPLASH_SEARCH_URL, timeout=10):
+    params = {
+        "query": query,
+        "per_page": 1,
+        "client_id": access_key
+    }
+    res = requests.get(url, params=params, timeout=timeout)
+    res.raise_for_status()
+    data = res.json()
+    if data["results"]:
+        return data["results"][0]["urls"]["regular"]
+    return None
+
+# Dish name is the part of the recipe before the em dash
+def get_dish_name(recipe_part):
+    return recipe_part.split("—")[0].strip() if "—" in recipe_part else recipe_part
+
+# --- Robust AI Response Parsing Function ---
+def parse_ai_response(text):
+    data = {}
+    keys_order = ["Comfort", "Recipe", "Vibe", "Song", "Anti-Stress Activity"]
+    current_key = None
+    current_value_lines = []
+    lines = text.strip().split('\n')
+    for line in lines:
+        line = line.strip()
+        found_key = False
+        for key in keys_order:
+            if line.startswith(f"**{key}:**"):
+                if current_key:
+                    data[current_key] = "\n".join(current_value_lines).strip()
+                current_key = key
+                current_value_lines = [line[len(f"**{key}:**"):].strip()]
+                found_key = True
+                break
+        if not found_key and current_key:
+            current_value_lines.append(line)
+    if current_key:
+        data[current_key] = "\n".join(current_value_lines).strip()
+    return data
+# --- End Robust AI Response Parsing Function ---
+
+# Function to get sentiment label - IMPROVED with more keywords
+def get_sentiment_label(polarity, mood_text):
+    mood_text_lower = mood_text.lower()
+        # Expanded lists for strong keywords
+    strong_negative_keywords = [
+        "depressed", "suicidal", "hopeless", "devastated", "miserable", "despair", "broken",
+        "crushed", "grief", "sorrow", "anguish", "dread", "heartbroken", "downhearted",
+        "distraught", "agonizing", "shattered", "desperate", "overwhelmed", "anxious",
+        "stressed", "terrible", "awful", "horrible", "sad", "unhappy", "lonely", "exhausted",
+        "tired", "worn out", "burnt out", "frustrated", "angry", "furious", "irritated",
+        "annoyed", "bitter", "resentful", "lost", "confused", "empty", "worthless",
+        "guilty", "ashamed", "scared", "fearful", "terrified", "panicked", "nervous"
+    ]
+    strong_positive_keywords = [
+        "ecstatic", "euphoric", "elated", "overjoyed", "thrilled", "jubilant", "blissful",
+        "fantastic", "amazing", "wonderful", "great", "excellent", "superb", "brilliant",
+        "happy", "joyful", "excited", "optimistic", "hopeful", "grateful", "blessed",
+        "proud", "confident", "energetic", "refreshed", "peaceful", "calm", "serene",
+        "loved", "appreciated", "inspired", "motivated", "content", "satisfied"
+    ]
+    # Check for strong negative keywords first
+    for keyword in strong_negative_keywords:
+        if keyword in mood_text_lower:
+            return "Very Negative 😥" # Override to very negative if such words are present
+    # Check for strong positive keywords
+    for keyword in strong_positive_keywords:
+        if keyword in mood_text_lower:
+            return "Very Positive 😄" # Override to very positive if such words are present
+    # Fallback to polarity score if no strong keywords are found
+    if polarity <= -0.5:
+        return "Very Negative 😔"
+    elif polarity <= -0.1:
+        return "Negative 😞"
+    elif polarity >= 0.5:
+        return "Very Positive 😄"
+    elif polarity >= 0.1:
+        return "Positive 🙂"
+    else:
+        return "Neutral 😐"
+
+STRESS_KEYWORDS = ["stressed", "anxious", "overwhelmed", "tense", "nervous"]
+
+# Fixed, universally comforting response used when a "human friend" comforts
+def build_human_friend_response():
+    comfort = "I’m here for you. It sounds like you're going through a lot. Let’s talk, cry, laugh — whatever you need, I’m with you. ❤️"
+    recipe = "Warm, homemade Chicken Noodle Soup — perfect for when you need a gentle hug in a bowl."
+    vibe = "☔️🌧️✨ — Blue, Grey, Warm Yellow" # Updated vibe for depressive mood
+    song = "'Fix You' — Coldplay" # More comforting song
+    anti_stress_activity = ""
+    response_text = f"""
+    **Comfort:** {comfort}
+    **Recipe:** {recipe}
+    **Vibe:** {vibe}
+    **Song:** {song}
+    """
+    if anti_stress_activity:
+        response_text += f"\n**Anti-Stress Activity:** {anti_stress_activity}"
+    return response_text
+
+# Build the LLM prompt for a mood and its sentiment label
+def build_comfort_prompt(mood, sentiment_label):
+    # --- Refined Sentiment Adjective for AI Prompt ---
+    sentiment_adjective = ""
+    if "very negative" in sentiment_label.lower():
+        sentiment_adjective = "feeling very low and needs extremely gentle, empathetic, and uplifting support"
+    elif "negative" in sentiment_label.lower():
+        sentiment_adjective = "feeling negative and needs understanding and uplifting support"
+    elif "very positive" in sentiment_label.lower():
+        sentiment_adjective = "feeling very positive and wants enthusiastic, joyful suggestions"
+    elif "positive" in sentiment_label.lower():
+        sentiment_adjective = "feeling positive and needs supportive, encouraging messages"
+    else:
+        sentiment_adjective = "feeling neutral and needs a general supportive and positive message"
+
+    # Check for stress keywords
+    is_stressed = any(keyword in mood.lower() for keyword in STRESS_KEYWORDS)
+
+    prompt = f"""
+    I am an emotionally intelligent assistant. A person just said: '{mood}'.
+    Based on my analysis, their mood suggests they are {sentiment_adjective}.
+    Please respond with the following in a friendly, soulful tone, specifically tailored to provide comfort and upliftment for their current emotional state:
+    1. Comfort: A short, kind, comforting message, explicitly acknowledging the depth of their feelings if negative.
+    2. Recipe: A recipe suggestion that gently matches their mood, focusing on comfort food if negative, or celebratory food if positive. Include dish name + short description.
+    3. Vibe: A string of 3–5 relevant emojis and a color palette (3 colors, names not codes) that genuinely reflects a pathway to positive emotion or acknowledges the current state with hope.
+    4. Song: A song title + artist that is genuinely soothing and uplifting for their specific mood.
+    """
+    if is_stressed:
+        prompt += """
+        5. Anti-Stress Activity: A short, interactive prompt or simple activity to help alleviate stress (e.g., a 2-minute mindful breathing guide, or "Describe your ideal calm place in three words.").
+        """
+
+    prompt += """
+    Format:
+    **Comfort:** ...
+    **Recipe:** ...
+    **Vibe:** ...
+    **Song:** ...
+    """
+    if is_stressed:
+        prompt += "**Anti-Stress Activity:** ..."
+    return prompt
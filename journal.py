@@ -0,0 +1,185 @@
+import datetime
+import sys
+import time
+import zlib
+from array import array
+
+# --- Compact Mood Journal ---
+# The journal used to be a list of dicts, one per entry, each holding its own
+# copies of the time string, the `who` / sentiment label strings and the full
+# raw LLM markdown. That adds up fast in st.session_state when many sessions are
+# open. Here every field lives in its own column:
+#   - time       -> epoch seconds in an int64 array
+#   - who, label -> small int codes into a shared table of interned strings
+#   - polarity   -> float32 array (NaN when missing)
+#   - response   -> zlib-compressed UTF-8 bytes
+# Entries are rebuilt as plain dicts on demand, so rendering and CSV export keep
+# working exactly as before.
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+JOURNAL_FIELDS = ["time", "mood", "who", "sentiment_polarity", "sentiment_label", "response"]
+
+# Known values get stable codes up front; anything else is appended on first use
+WHO_VALUES = ["🤖 AI", "🧑 Human Friend"]
+SENTIMENT_LABEL_VALUES = [
+    "Very Negative 😥", "Very Negative 😔", "Negative 😞", "Neutral 😐",
+    "Positive 🙂", "Very Positive 😄",
+]
+
+
+class _CodeTable:
+    """Maps repeated strings to small int codes (None is always code 0).
+
+    Codes are stored in unsigned-byte arrays, so a table holds at most 256
+    values. `who` and the sentiment label only ever take a handful.
+    """
+    __slots__ = ("values", "codes")
+    MAX_CODES = 256
+
+    def __init__(self, values):
+        self.values = [None]
+        self.codes = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value):
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            if code >= self.MAX_CODES:
+                raise ValueError(f"too many distinct values to encode: {value!r}")
+            self.values.append(sys.intern(value))
+            self.codes[value] = code
+        return code
+
+    def decode(self, code):
+        return self.values[code]
+
+
+class CompactJournal:
+    """Columnar, list-like mood journal whose items are entry dicts."""
+    __slots__ = ("_times", "_moods", "_who", "_polarity", "_labels", "_responses",
+                 "_who_table", "_label_table")
+
+    def __init__(self, entries=()):
+        self._times = array("q")
+        self._moods = []
+        self._who = array("B")
+        self._polarity = array("f")
+        self._labels = array("B")
+        self._responses = []
+        self._who_table = _CodeTable(WHO_VALUES)
+        self._label_table = _CodeTable(SENTIMENT_LABEL_VALUES)
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry):
+        timestamp = entry.get("timestamp")
+        if timestamp is None:
+            timestamp = time.time()
+        timestamp = int(timestamp)
+        polarity = entry.get("sentiment_polarity")
+        polarity = float("nan") if polarity is None else float(polarity)
+        mood = entry.get("mood") or ""
+        response = zlib.compress((entry.get("response") or "").encode("utf-8"))
+        who_code = self._who_table.encode(entry.get("who"))
+        label_code = self._label_table.encode(entry.get("sentiment_label"))
+        # Everything that can raise is done above, so the columns always stay the same length
+        self._times.append(timestamp)
+        self._moods.append(mood)
+        self._who.append(who_code)
+        self._polarity.append(polarity)
+        self._labels.append(label_code)
+        self._responses.append(response)
+
+    def clear(self):
+        self.__init__()
+
+    def _entry(self, i):
+        polarity = self._polarity[i]
+        return {
+            "time": datetime.datetime.fromtimestamp(self._times[i]).strftime(TIME_FORMAT),
+            "mood": self._moods[i],
+            "who": self._who_table.decode(self._who[i]),
+            # float32 widens e.g. -0.35 to -0.3499999940395355; TextBlob is nowhere near that precise
+            "sentiment_polarity": None if polarity != polarity else round(polarity, 6),
+            "sentiment_label": self._label_table.decode(self._labels[i]),
+            "response": zlib.decompress(self._responses[i]).decode("utf-8"),
+        }
+
+    def __len__(self):
+        return len(self._times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("journal index out of range")
+        return self._entry(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._entry(i)
+
+    def to_records(self):
+        # List of entry dicts, ready for pd.DataFrame(...)
+        return list(self)
+
+    def nbytes(self):
+        # Approximate memory held by the journal's columns and their contents
+        size = sys.getsizeof(self)
+        for column in (self._times, self._who, self._polarity, self._labels):
+            size += sys.getsizeof(column)
+        for column in (self._moods, self._responses):
+            size += sys.getsizeof(column) + sum(sys.getsizeof(item) for item in column)
+        return size
+# --- End Compact Mood Journal ---
+
+
+def _list_journal_nbytes(entries):
+    # Memory held by the old list-of-dicts journal (shared interned strings counted once)
+    size = sys.getsizeof(entries)
+    seen = set()
+    for entry in entries:
+        size += sys.getsizeof(entry)
+        for value in entry.values():
+            if id(value) not in seen:
+                seen.add(id(value))
+                size += sys.getsizeof(value)
+    return size
+
+
+if __name__ == "__main__":
+    # Rough bytes-per-entry comparison: python journal.py [entries]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sample_response = (
+        "**Comfort:** I hear you, and it's completely okay to feel this way right now. "
+        "You've been carrying a lot, and taking a moment for yourself is a brave thing to do.\n"
+        "**Recipe:** Creamy Tomato Basil Soup — a warm, velvety bowl with a swirl of cream "
+        "and fresh basil, perfect with a grilled cheese on the side.\n"
+        "**Vibe:** 🌧️☕️🕯️🌼 — Soft Grey, Warm Amber, Sage Green\n"
+        "**Song:** 'Here Comes the Sun' — The Beatles\n"
+        "**Anti-Stress Activity:** Breathe in for four counts, hold for four, and breathe out "
+        "for six. Repeat five times and notice how your shoulders feel."
+    )
+    old_journal = []
+    new_journal = CompactJournal()
+    for i in range(n):
+        entry = {
+            "mood": f"Feeling stressed and tired after a long week at work #{i}",
+            "who": "🤖 AI",
+            "sentiment_polarity": -0.35,
+            "sentiment_label": "Very Negative 😥",
+            # Each LLM reply is a distinct string object, just as in the app
+            "response": "".join([sample_response, " " * (i % 2)]),
+        }
+        new_journal.append(entry)
+        old_journal.append({"time": datetime.datetime.now().strftime(TIME_FORMAT), **entry})
+    old_size = _list_journal_nbytes(old_journal) / n
+    new_size = new_journal.nbytes() / n
+    print(f"list of dicts:   {old_size:8.1f} bytes/entry")
+    print(f"CompactJournal:  {new_size:8.1f} bytes/entry ({new_size / old_size:.0%})")
@@ -0,0 +1,237 @@
+import json
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import bulk
+
+# End-to-end tests for bulk.py against a local stub of the Groq and Unsplash APIs
+
+
+class StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.chat_moods = []      # Mood of every chat request that got a 200
+        self.rate_limited = 0     # 429s sent
+        self.flaky_failed = set() # "FLAKY" moods that already failed once
+        self.image_queries = Counter()
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][0]["content"]
+            mood = prompt.split("A person just said: '", 1)[1].split("'.", 1)[0]
+            with state.lock:
+                # The very first request is rate limited; the SDK should retry it
+                if state.rate_limited == 0 and not state.chat_moods:
+                    state.rate_limited += 1
+                    return self._send(429, {"error": {"message": "rate limited"}},
+                                      {"retry-after-ms": "10", "retry-after": "0"})
+                # FLAKY moods fail once (400 is not retried) and succeed on the next run
+                if "FLAKY" in mood and mood not in state.flaky_failed:
+                    state.flaky_failed.add(mood)
+                    return self._send(400, {"error": {"message": "bad request"}})
+                state.chat_moods.append(mood)
+            dish = "Tomato Soup" if "soup" in mood else "Pancakes"
+            content = (f"**Comfort:** You've got this.\n**Recipe:** {dish} — warm and simple\n"
+                       f"**Vibe:** ✨🌼 — Blue, Gold, Cream\n**Song:** 'Fix You' — Coldplay")
+            self._send(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+            })
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)["query"][0]
+            with state.lock:
+                state.image_queries[query] += 1
+            self._send(200, {"results": [{"urls": {"regular": f"https://img.test/{query.replace(' ', '-')}"}}]})
+
+    return Handler
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    state = StubState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("UNSPLASH_ACCESS_KEY", "test-key")
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def run_bulk(stub, input_path, output_path, *extra):
+    return bulk.main([
+        str(input_path), str(output_path),
+        "--groq-base-url", stub.url,
+        "--unsplash-url", f"{stub.url}/search/photos",
+        "--requests-per-minute", "0",
+        "--max-retries", "2",
+        *extra,
+    ])
+
+
+def test_retries_resumes_and_dedupes_images(tmp_path, stub, monkeypatch):
+    limiter_waits = []
+    original_wait = bulk.RateLimiter.wait
+
+    async def counting_wait(self):
+        limiter_waits.append(1)
+        await original_wait(self)
+
+    monkeypatch.setattr(bulk.RateLimiter, "wait", counting_wait)
+    moods = [
+        {"id": "a", "mood": "I want soup today"},
+        {"id": "b", "mood": "Feeling stressed, soup please"},
+        {"id": "c", "mood": "FLAKY but hopeful"},
+        {"id": "d", "mood": "A happy morning"},
+        {"id": "e", "mood": "Tired after work"},
+        {"id": "f", "mood": "Just okay"},
+    ]
+    input_path = tmp_path / "moods.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    write_jsonl(input_path, moods)
+
+    # First run: the 429 is retried, the FLAKY mood fails and is left out
+    assert run_bulk(stub, input_path, output_path, "--id-column", "id") == 1
+    records = read_jsonl(output_path)
+    assert stub.rate_limited == 1
+    # Six moods plus the retried 429, every attempt paced by the limiter
+    assert len(limiter_waits) == 7
+    assert sorted(r["id"] for r in records) == ["a", "b", "d", "e", "f"]
+    # Two distinct dishes, each looked up exactly once
+    assert stub.image_queries == Counter({"Tomato Soup": 1, "Pancakes": 1})
+    soup = next(r for r in records if r["id"] == "a")
+    assert soup["dish_name"] == "Tomato Soup"
+    assert soup["image_url"] == "https://img.test/Tomato-Soup"
+    assert soup["comfort"] == "You've got this."
+
+    # Re-run retries only the failed mood
+    assert run_bulk(stub, input_path, output_path, "--id-column", "id") == 0
+    assert sorted(r["id"] for r in read_jsonl(output_path)) == ["a", "b", "c", "d", "e", "f"]
+    assert stub.chat_moods.count("FLAKY but hopeful") == 1
+
+    # Simulate a run killed mid-write: keep three records plus half of the fourth
+    lines = output_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    output_path.write_text("".join(lines[:3]) + lines[3][:20], encoding="utf-8")
+    requests_before = len(stub.chat_moods)
+    assert run_bulk(stub, input_path, output_path, "--id-column", "id") == 0
+    ids = [r["id"] for r in read_jsonl(output_path)]
+    assert sorted(ids) == ["a", "b", "c", "d", "e", "f"]
+    assert len(stub.chat_moods) - requests_before == 3
+
+
+def test_parquet_parts_share_one_schema(tmp_path, stub, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    input_path = tmp_path / "moods.csv"
+    input_path.write_text("mood\nsoup weather\nsunny day\nquiet evening\n", encoding="utf-8")
+    output_path = tmp_path / "out.parquet"
+
+    # The first batch gets no image URLs at all, the second does
+    monkeypatch.delenv("UNSPLASH_ACCESS_KEY")
+    assert run_bulk(stub, input_path, output_path, "--batch-size", "2") == 0
+    monkeypatch.setenv("UNSPLASH_ACCESS_KEY", "test-key")
+    (output_path / ".part-00009.parquet.tmp").write_bytes(b"truncated") # Left by a killed run
+    input_path.write_text("mood\nsoup weather\nsunny day\nquiet evening\nsoup again\n", encoding="utf-8")
+    assert run_bulk(stub, input_path, output_path, "--batch-size", "2") == 0
+
+    table = pq.read_table(output_path)
+    assert table.num_rows == 4
+    assert str(table.schema.field("image_url").type) == "string"
+    assert str(table.schema.field("sentiment_polarity").type) == "double"
+    assert not any(name.endswith(".tmp") for name in os.listdir(output_path))
+
+
+def test_duplicate_ids_processed_once(tmp_path, stub, capsys):
+    input_path = tmp_path / "moods.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    write_jsonl(input_path, [
+        {"id": "1", "mood": "first"},
+        {"id": "1", "mood": "first again"},
+        {"id": "2", "mood": 5}, # Non-string moods are converted, not fatal
+    ])
+    assert run_bulk(stub, input_path, output_path, "--id-column", "id", "--no-images") == 0
+    records = read_jsonl(output_path)
+    assert [(r["id"], r["mood"]) for r in records] == [("1", "first"), ("2", "5")]
+    assert "Skipping mood 1: duplicate id in input" in capsys.readouterr().err
+
+
+def test_bad_rows_are_skipped_with_a_warning(tmp_path, stub, capsys):
+    input_path = tmp_path / "moods.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    input_path.write_text(
+        '{"id": "1", "mood": "first"}\n'
+        '{"id": "2", "mood": "trunc\n'
+        '[1, 2]\n'
+        '{"id": "", "mood": "no id"}\n'
+        '{"id": "5", "mood": "last"}\n',
+        encoding="utf-8",
+    )
+    assert run_bulk(stub, input_path, output_path, "--id-column", "id", "--no-images") == 0
+    assert [r["id"] for r in read_jsonl(output_path)] == ["1", "5"]
+    err = capsys.readouterr().err
+    assert "Skipping row 2: invalid JSON" in err
+    assert "Skipping row 3: not a JSON object" in err
+    assert "Skipping row 4: no 'id' value" in err
+
+
+def test_blank_csv_ids_are_not_duplicates(tmp_path, stub, capsys):
+    input_path = tmp_path / "moods.csv"
+    output_path = tmp_path / "out.jsonl"
+    input_path.write_text("id,mood\n,sad soup\n,happy soup\n7,meh\n", encoding="utf-8")
+    assert run_bulk(stub, input_path, output_path, "--id-column", "id", "--no-images") == 0
+    assert [r["id"] for r in read_jsonl(output_path)] == ["7"]
+    err = capsys.readouterr().err
+    assert err.count("no 'id' value") == 2
+    assert "duplicate" not in err
+
+
+def test_unknown_text_column_is_an_error(tmp_path, stub):
+    input_path = tmp_path / "moods.csv"
+    input_path.write_text("feeling\nsad\n", encoding="utf-8")
+    with pytest.raises(SystemExit) as excinfo:
+        run_bulk(stub, input_path, tmp_path / "out.jsonl")
+    assert excinfo.value.code == 2
+
+
+@pytest.mark.parametrize("option", ["--requests-per-minute", "--max-retries"])
+def test_negative_limits_are_an_error(tmp_path, stub, option):
+    input_path = tmp_path / "moods.csv"
+    input_path.write_text("mood\nsad\n", encoding="utf-8")
+    with pytest.raises(SystemExit) as excinfo:
+        run_bulk(stub, input_path, tmp_path / "out.jsonl", option, "-1")
+    assert excinfo.value.code == 2
@@ -0,0 +1,103 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from journal import JOURNAL_FIELDS, TIME_FORMAT, CompactJournal
+
+
+def make_entry(i, **overrides):
+    entry = {
+        "timestamp": 1700000000 + i * 60,
+        "mood": f"mood {i}",
+        "who": "🤖 AI",
+        "sentiment_polarity": -0.35,
+        "sentiment_label": "Negative 😞",
+        "response": f"**Comfort:** hang in there {i} ✨\n**Recipe:** Soup — warm",
+    }
+    entry.update(overrides)
+    return entry
+
+
+def column_lengths(journal):
+    return {len(column) for column in (
+        journal._times, journal._moods, journal._who,
+        journal._polarity, journal._labels, journal._responses,
+    )}
+
+
+def test_round_trip_and_indexing():
+    journal = CompactJournal(make_entry(i) for i in range(3))
+    assert len(journal) == 3
+    assert journal[0] == {
+        "time": datetime.datetime.fromtimestamp(1700000000).strftime(TIME_FORMAT),
+        "mood": "mood 0",
+        "who": "🤖 AI",
+        "sentiment_polarity": -0.35, # Not the widened float32 value
+        "sentiment_label": "Negative 😞",
+        "response": "**Comfort:** hang in there 0 ✨\n**Recipe:** Soup — warm",
+    }
+    # The app renders newest first with journal[::-1]
+    assert [entry["mood"] for entry in journal[::-1]] == ["mood 2", "mood 1", "mood 0"]
+    assert journal[-1]["mood"] == "mood 2"
+    assert [entry["mood"] for entry in journal] == ["mood 0", "mood 1", "mood 2"]
+    with pytest.raises(IndexError):
+        journal[3]
+    with pytest.raises(IndexError):
+        journal[-4]
+
+
+def test_empty_journal_is_falsy():
+    journal = CompactJournal()
+    assert not journal
+    assert journal[::-1] == []
+    journal.append(make_entry(0))
+    assert journal
+
+
+def test_missing_values_come_back_as_none():
+    journal = CompactJournal([make_entry(0, sentiment_polarity=None, sentiment_label=None, who=None)])
+    entry = journal[0]
+    assert entry["sentiment_polarity"] is None
+    assert entry["sentiment_label"] is None
+    assert entry["who"] is None
+
+
+def test_unknown_values_get_new_codes():
+    journal = CompactJournal([
+        make_entry(0, who="🐱 Cat", sentiment_label="Mixed 🤷"),
+        make_entry(1, who="🐱 Cat"),
+        make_entry(2),
+    ])
+    assert [entry["who"] for entry in journal] == ["🐱 Cat", "🐱 Cat", "🤖 AI"]
+    assert [entry["sentiment_label"] for entry in journal] == ["Mixed 🤷", "Negative 😞", "Negative 😞"]
+    assert journal._who[0] == journal._who[1] != journal._who[2]
+
+
+def test_code_table_limit_leaves_columns_aligned():
+    journal = CompactJournal()
+    with pytest.raises(ValueError):
+        for i in range(300):
+            journal.append(make_entry(i, who=f"friend {i}"))
+    # None plus the two known values take three codes
+    assert len(journal) == 256 - 3
+    assert column_lengths(journal) == {len(journal)}
+    assert journal[-1]["who"] == f"friend {len(journal) - 1}"
+
+
+def test_bad_polarity_leaves_columns_aligned():
+    journal = CompactJournal([make_entry(0)])
+    with pytest.raises((TypeError, ValueError)):
+        journal.append(make_entry(1, sentiment_polarity="very sad"))
+    assert len(journal) == 1
+    assert column_lengths(journal) == {1}
+    journal.append(make_entry(2))
+    assert journal[-1]["mood"] == "mood 2"
+
+
+def test_to_records_feeds_dataframe():
+    journal = CompactJournal(make_entry(i) for i in range(2))
+    df = pd.DataFrame(journal.to_records())
+    assert list(df.columns) == JOURNAL_FIELDS
+    assert df["mood"].tolist() == ["mood 0", "mood 1"]
+    assert df["sentiment_polarity"].tolist() == [-0.35, -0.35]